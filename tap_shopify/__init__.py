@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 import os
+import sys
+import collections
+import concurrent.futures
 import datetime
 import json
 import time
 import math
-import copy
+import functools
 
+import orjson
 import pyactiveresource
 import shopify
 import singer
@@ -14,12 +18,17 @@ from singer import metadata
 from singer import Transformer
 from tap_shopify.context import Context
 from tap_shopify.exceptions import ShopifyError
-from tap_shopify.streams.base import shopify_error_handling, get_request_timeout, ShopifyAPIError
+from tap_shopify.transform import compile_transform
+from tap_shopify.streams.base import (shopify_error_handling, get_request_timeout, ShopifyAPIError,
+                                     write_record, flush_records, write_state, MESSAGE_LOCK)
 
 REQUIRED_CONFIG_KEYS = ["shop", "api_key"]
 LOGGER = singer.get_logger()
 SDC_KEYS = {'id': 'integer', 'name': 'string', 'myshopify_domain': 'string'}
+SDC_PROPERTY_SCHEMAS = {'_sdc_shop_' + k: {'type': ["null", v]} for k, v in SDC_KEYS.items()}
 UNSUPPORTED_FIELDS = {"author"}
+APP_SCOPES_QUERY = "query { currentAppInstallation { accessScopes { handle } } }"
+DEFAULT_MAX_WORKERS = 1
 
 @shopify_error_handling
 def initialize_shopify_client():
@@ -36,19 +45,13 @@ def initialize_shopify_client():
     return shopify.Shop.current().attributes
 
 # Add helper
+# The granted scopes do not change during a run, so the GraphQL call is only made once
+@functools.lru_cache(maxsize=1)
 def fetch_app_scopes():
-    query = """
-    query {
-      currentAppInstallation {
-        accessScopes {
-          handle
-        }
-      }
-    }
-    """
-    data = json.loads(shopify.GraphQL().execute(query))
+    data = orjson.loads(shopify.GraphQL().execute(APP_SCOPES_QUERY))
     return {s["handle"] for s in data["data"]["currentAppInstallation"]["accessScopes"]}
 
+@functools.lru_cache(maxsize=1)
 def has_read_users_access():
     # If the app does not have the 'read_users' scope, return False
     if 'read_users' not in fetch_app_scopes():
@@ -63,16 +66,20 @@ def get_abs_path(path):
     return os.path.join(os.path.dirname(os.path.realpath(__file__)), path)
 
 # Load schemas from schemas folder
+# The schema files are static, so they are only read and parsed once per process
+@functools.lru_cache(maxsize=1)
 def load_schemas():
     schemas = {}
 
     # This schema represents many of the currency values as JSON schema
     # 'number's, which may result in lost precision.
-    for filename in sorted(os.listdir(get_abs_path('schemas'))):
-        path = get_abs_path('schemas') + '/' + filename
-        schema_name = filename.replace('.json', '')
-        with open(path, encoding='UTF-8') as file:
-            schemas[schema_name] = json.load(file)
+    with os.scandir(get_abs_path('schemas')) as entries:
+        schema_files = sorted((entry for entry in entries if entry.name.endswith('.json')),
+                              key=lambda entry: entry.name)
+
+    for schema_file in schema_files:
+        with open(schema_file.path, 'rb') as file:
+            schemas[schema_file.name[:-len('.json')]] = orjson.loads(file.read())
 
     return schemas
 
@@ -85,10 +92,17 @@ def get_discovery_metadata(stream, schema):
     if stream.replication_key:
         mdata = metadata.write(mdata, (), 'valid-replication-keys', [stream.replication_key])
 
+    # Only check the app scopes when the schema has a field that requires them
+    unsupported_fields = UNSUPPORTED_FIELDS.intersection(schema['properties'])
+    if unsupported_fields and has_read_users_access():
+        unsupported_fields = set()
+
+    automatic_fields = frozenset(stream.key_properties) | {stream.replication_key}
+
     for field_name in schema['properties'].keys():
-        if field_name in stream.key_properties or field_name == stream.replication_key:
+        if field_name in automatic_fields:
             mdata = metadata.write(mdata, ('properties', field_name), 'inclusion', 'automatic')
-        elif field_name in UNSUPPORTED_FIELDS and not has_read_users_access():
+        elif field_name in unsupported_fields:
             mdata = metadata.write(mdata, ('properties', field_name), 'inclusion', 'unsupported')
         else:
             mdata = metadata.write(mdata, ('properties', field_name), 'inclusion', 'available')
@@ -96,9 +110,9 @@ def get_discovery_metadata(stream, schema):
     return metadata.to_list(mdata)
 
 def add_synthetic_key_to_schema(schema):
-    for k in SDC_KEYS:
-        schema['properties']['_sdc_shop_' + k] = {'type': ["null", SDC_KEYS[k]]}
-    return schema
+    # Build a new schema rather than mutating the cached one, the nested property
+    # schemas are not modified so they can be shared
+    return {**schema, 'properties': {**schema['properties'], **SDC_PROPERTY_SCHEMAS}}
 
 def discover():
     initialize_shopify_client() # Checking token in discover mode
@@ -132,19 +146,121 @@ def shuffle_streams(stream_name):
     Takes the name of the first stream to sync and reshuffles the order
     of the list to put it at the top
     '''
-    matching_index = 0
-    for i, catalog_entry in enumerate(Context.catalog["streams"]):
-        if catalog_entry["tap_stream_id"] == stream_name:
-            matching_index = i
-    top_half = Context.catalog["streams"][matching_index:]
-    bottom_half = Context.catalog["streams"][:matching_index]
-    Context.catalog["streams"] = top_half + bottom_half
-
-# pylint: disable=too-many-locals
+    matching_index = next((i for i, catalog_entry in enumerate(Context.catalog["streams"])
+                           if catalog_entry["tap_stream_id"] == stream_name), 0)
+    streams = collections.deque(Context.catalog["streams"])
+    streams.rotate(-matching_index)
+    Context.catalog["streams"] = list(streams)
+
+def get_max_workers():
+    """
+    Number of streams synced in parallel, from the optional `max_workers` config.
+    Streams are synced one at a time by default.
+    """
+    max_workers = DEFAULT_MAX_WORKERS
+    try:
+        max_workers = int(Context.config.get("max_workers"))
+    except TypeError:
+        # None value or no key
+        pass
+    except ValueError:
+        LOGGER.info('Failed to parse max_workers value of "%s" as an integer, '
+                    'falling back to default of %d',
+                    Context.config['max_workers'],
+                    DEFAULT_MAX_WORKERS)
+    return max(max_workers, 1)
+
+def sync_stream(catalog_entry, sdc_fields):
+    """
+    Syncs the records of a single stream. Returns False when the stream could
+    not be synced because of missing access scopes.
+    """
+    stream_id = catalog_entry['tap_stream_id']
+    stream = Context.stream_objects[stream_id]()
+    # Keep the metadata map on the catalog entry so it is only built once per stream
+    if '_metadata_map' not in catalog_entry:
+        catalog_entry['_metadata_map'] = metadata.to_map(catalog_entry['metadata'])
+
+    LOGGER.info('Syncing stream: %s', stream_id)
+
+    try:
+        # some fields have epoch-time as date, hence transform into UTC date
+        with Transformer(singer.UNIX_SECONDS_INTEGER_DATETIME_PARSING) as transformer:
+            record_schema = catalog_entry['schema']
+            record_metadata = catalog_entry['_metadata_map']
+            transform_record = compile_transform(transformer, record_schema, record_metadata)
+            for rec in stream.sync():
+                extraction_time = singer.utils.now()
+                # Records are freshly decoded from each response, so update them in place
+                rec.update(sdc_fields)
+                rec = transform_record(rec)
+                write_record(stream_id,
+                             rec,
+                             time_extracted=extraction_time)
+                Context.counts[stream_id] += 1
+    except ShopifyAPIError as e:
+        if stream_id == 'fulfillment_orders' and 'Access denied' in str(e.__cause__):
+            return False
+        raise e
+    finally:
+        flush_records()
+
+    return True
+
+def sync_streams_sequentially(catalog_entries, sdc_fields):
+    require_reauth = False
+
+    for catalog_entry in catalog_entries:
+        stream_id = catalog_entry['tap_stream_id']
+
+        if not Context.state.get('bookmarks'):
+            Context.state['bookmarks'] = {}
+        Context.state['bookmarks']['currently_sync_stream'] = stream_id
+        write_state(Context.state)
+
+        if not sync_stream(catalog_entry, sdc_fields):
+            require_reauth = True
+            continue
+
+        Context.state['bookmarks'].pop('currently_sync_stream')
+        write_state(Context.state)
+
+    return require_reauth
+
+def sync_streams_in_parallel(catalog_entries, sdc_fields, max_workers):
+    """
+    Syncs the streams in a thread pool. Each stream queries the API on its own,
+    so streams don't depend on each other. The stream bookmarks are used to
+    resume, as currently_sync_stream can't describe several syncing streams.
+    """
+    with MESSAGE_LOCK:
+        Context.state.get('bookmarks', {}).pop('currently_sync_stream', None)
+        write_state(Context.state)
+
+    # The session headers are stored per thread by the Shopify SDK
+    session_headers = dict(shopify.ShopifyResource.get_headers())
+
+    def activate_session():
+        shopify.ShopifyResource.set_headers(dict(session_headers))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                               initializer=activate_session) as executor:
+        futures = [executor.submit(sync_stream, catalog_entry, sdc_fields)
+                   for catalog_entry in catalog_entries]
+        try:
+            results = [future.result() for future in futures]
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+    return not all(results)
+
 def sync():
     shop_attributes = initialize_shopify_client()
     sdc_fields = {"_sdc_shop_" + x: shop_attributes[x] for x in SDC_KEYS}
-    require_reauth = False
+    selected_streams = frozenset(s["tap_stream_id"] for s in Context.catalog["streams"]
+                                 if Context.is_selected(s["tap_stream_id"]))
 
     # If there is a currently syncing stream bookmark, shuffle the
     # stream order so it gets sync'd first
@@ -154,51 +270,25 @@ def sync():
 
     # Emit all schemas first so we have them for child streams
     for stream in Context.catalog["streams"]:
-        if Context.is_selected(stream["tap_stream_id"]):
+        if stream["tap_stream_id"] in selected_streams:
             singer.write_schema(stream["tap_stream_id"],
                                 stream["schema"],
                                 stream["key_properties"],
                                 bookmark_properties=stream["replication_key"])
             Context.counts[stream["tap_stream_id"]] = 0
 
-    # Loop over streams in catalog
+    catalog_entries = []
     for catalog_entry in Context.catalog['streams']:
-        stream_id = catalog_entry['tap_stream_id']
-        stream = Context.stream_objects[stream_id]()
-
-        if not Context.is_selected(stream_id):
-            LOGGER.info('Skipping stream: %s', stream_id)
+        if catalog_entry['tap_stream_id'] not in selected_streams:
+            LOGGER.info('Skipping stream: %s', catalog_entry['tap_stream_id'])
             continue
+        catalog_entries.append(catalog_entry)
 
-        LOGGER.info('Syncing stream: %s', stream_id)
-
-        if not Context.state.get('bookmarks'):
-            Context.state['bookmarks'] = {}
-        Context.state['bookmarks']['currently_sync_stream'] = stream_id
-        singer.write_state(Context.state)
-
-        try:
-            # some fields have epoch-time as date, hence transform into UTC date
-            with Transformer(singer.UNIX_SECONDS_INTEGER_DATETIME_PARSING) as transformer:
-                for rec in stream.sync():
-                    extraction_time = singer.utils.now()
-                    record_schema = catalog_entry['schema']
-                    record_metadata = metadata.to_map(catalog_entry['metadata'])
-                    rec = transformer.transform({**rec, **sdc_fields},
-                                                record_schema,
-                                                record_metadata)
-                    singer.write_record(stream_id,
-                                        rec,
-                                        time_extracted=extraction_time)
-                    Context.counts[stream_id] += 1
-        except ShopifyAPIError as e:
-            if stream_id == 'fulfillment_orders' and 'Access denied' in str(e.__cause__):
-                require_reauth = True
-                continue
-            raise e
-
-        Context.state['bookmarks'].pop('currently_sync_stream')
-        singer.write_state(Context.state)
+    max_workers = get_max_workers()
+    if max_workers > 1:
+        require_reauth = sync_streams_in_parallel(catalog_entries, sdc_fields, max_workers)
+    else:
+        require_reauth = sync_streams_sequentially(catalog_entries, sdc_fields)
 
     LOGGER.info('----------------------')
     for stream_id, stream_count in Context.counts.items():
@@ -221,7 +311,9 @@ def main():
         # If discover flag was passed, run discovery mode and dump output to stdout
         if args.discover:
             catalog = discover()
-            print(json.dumps(catalog, indent=2))
+            sys.stdout.write(
+                orjson.dumps(catalog, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+                .decode('utf-8'))
         # Otherwise run in sync mode
         else:
             Context.tap_start = utils.now()
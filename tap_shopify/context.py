@@ -10,6 +10,7 @@ class Context():
     stream_map = {}
     stream_objects = {}
     counts = {}
+    last_written_state = None
 
     @classmethod
     def get_catalog_entry(cls, stream_name):
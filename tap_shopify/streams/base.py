@@ -3,10 +3,14 @@ import functools
 import json
 import re
 import socket
+import sys
+import threading
+import time
 import urllib
 from urllib.error import URLError
 import http
 import backoff
+import orjson
 import pyactiveresource
 import pyactiveresource.formats
 import shopify
@@ -30,6 +34,17 @@ DEFAULT_DATE_WINDOW = 30
 # We will retry a 500 error a maximum of 5 times before giving up
 MAX_RETRIES = 5
 
+# Pause between requests once more than 70% of the query cost bucket is used
+THROTTLE_THRESHOLD = 0.7
+
+# Number of record messages buffered before they are written to stdout
+RECORD_BATCH_SIZE = 1000
+
+RECORD_MESSAGES = []
+
+# Guards the record buffer and state so streams synced in parallel don't interleave messages
+MESSAGE_LOCK = threading.RLock()
+
 
 # function to return request timeout
 def get_request_timeout():
@@ -64,6 +79,39 @@ def execute_gql(self, query, variables=None, operation_name=None, timeout=None):
 
 shopify.GraphQL.execute  = execute_gql
 
+def write_record(stream_name, record, time_extracted=None):
+    """
+    Buffers a record message and writes the buffer once it holds RECORD_BATCH_SIZE
+    messages, instead of writing and flushing stdout for every record.
+    """
+    message = singer.format_message(
+        singer.RecordMessage(stream=stream_name, record=record, time_extracted=time_extracted))
+    with MESSAGE_LOCK:
+        RECORD_MESSAGES.append(message)
+        if len(RECORD_MESSAGES) >= RECORD_BATCH_SIZE:
+            flush_records()
+
+def flush_records():
+    with MESSAGE_LOCK:
+        if RECORD_MESSAGES:
+            sys.stdout.write('\n'.join(RECORD_MESSAGES) + '\n')
+            sys.stdout.flush()
+            RECORD_MESSAGES.clear()
+
+def write_state(state):
+    """
+    Writes any buffered records before the state message so a bookmark is never
+    emitted ahead of the records it covers. A state identical to the last one
+    written is skipped.
+    """
+    with MESSAGE_LOCK:
+        flush_records()
+        serialized_state = orjson.dumps(state)
+        if serialized_state == Context.last_written_state:
+            return
+        singer.write_state(state)
+        Context.last_written_state = serialized_state
+
 def is_not_status_code_fn(status_code):
     def gen_fn(exc):
         if getattr(exc, 'code', None) and exc.code not in status_code:
@@ -91,6 +139,29 @@ def is_timeout_error(error_raised):
         return False
     return True
 
+def throttle_on_query_cost(response):
+    """
+    Reads the query cost bucket from the GraphQL response extensions and sleeps
+    until it is back under THROTTLE_THRESHOLD, so requests are paced before
+    Shopify starts throttling them.
+    """
+    throttle_status = response.get("extensions", {}).get("cost", {}).get("throttleStatus")
+    if not throttle_status:
+        return
+
+    maximum_available = throttle_status.get("maximumAvailable")
+    currently_available = throttle_status.get("currentlyAvailable")
+    restore_rate = throttle_status.get("restoreRate")
+    if not (maximum_available and restore_rate) or currently_available is None:
+        return
+
+    required_available = maximum_available * (1 - THROTTLE_THRESHOLD)
+    if currently_available < required_available:
+        wait = (required_available - currently_available) / restore_rate
+        LOGGER.info("Query cost bucket at %s/%s -- sleeping for %.2f seconds",
+                    maximum_available - currently_available, maximum_available, wait)
+        time.sleep(wait)
+
 def shopify_error_handling(fnc):
     @backoff.on_exception(backoff.expo,
                           (http.client.IncompleteRead, ConnectionResetError,
@@ -213,14 +284,15 @@ class Stream():
         # NOTE: Bookmarking can never be updated to not get the most
         # recent thing it saw the next time you run, because the querying
         # only allows greater than or equal semantics.
-        singer.write_bookmark(
-            Context.state,
-            # name is overridden by some substreams
-            self.name,
-            bookmark_key or self.replication_key,
-            bookmark_value
-        )
-        singer.write_state(Context.state)
+        with MESSAGE_LOCK:
+            singer.write_bookmark(
+                Context.state,
+                # name is overridden by some substreams
+                self.name,
+                bookmark_key or self.replication_key,
+                bookmark_value
+            )
+            write_state(Context.state)
 
     def remove_fields_from_query(self, fields_to_remove: list) -> str:
         ast = parse(self.get_query())
@@ -278,6 +350,7 @@ class Stream():
                 timeout=self.request_timeout
             )
             response = json.loads(response)
+            throttle_on_query_cost(response)
             if "errors" in response.keys():
                 raise ShopifyAPIError(response["errors"])
 
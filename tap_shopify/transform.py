@@ -0,0 +1,274 @@
+import decimal
+import re
+
+from singer.transform import (NO_INTEGER_DATETIME_PARSING,
+                              UNIX_SECONDS_INTEGER_DATETIME_PARSING,
+                              VALID_DATETIME_FORMATS,
+                              string_to_datetime,
+                              unix_seconds_to_datetime,
+                              unix_milliseconds_to_datetime)
+
+# Errors the integer datetime parsers raise for values that are not timestamps
+DATETIME_PARSE_ERRORS = (TypeError, ValueError, OverflowError, OSError)
+
+
+class UnsupportedSchema(Exception):
+    """Raised when a schema or metadata can't be compiled and the generic Transformer is used"""
+
+
+def compile_transform(transformer, schema, mdata=None):
+    """
+    Returns a function transforming a record the same way as
+    `transformer.transform(record, schema, mdata)`.
+
+    The schema is walked once and turned into nested closures, so the type
+    dispatch done by the Transformer for every value of every record only
+    happens once per stream. If a record doesn't match the schema, it is
+    passed to the Transformer so the same SchemaMismatch error is raised.
+    Falls back to the Transformer for schemas and metadata it can't compile.
+    """
+    def transform_generic(data):
+        return transformer.transform(data, schema, mdata)
+
+    if transformer.pre_hook or transformer.integer_datetime_fmt not in VALID_DATETIME_FORMATS:
+        return transform_generic
+
+    try:
+        skip_fields = get_skipped_fields(mdata)
+        transform_schema = compile_schema(schema,
+                                          get_datetime_parser(transformer.integer_datetime_fmt))
+    except UnsupportedSchema:
+        return transform_generic
+
+    def transform_record(data):
+        filtered_data = data
+        if not skip_fields.isdisjoint(data):
+            filtered_data = {k: v for k, v in data.items() if k not in skip_fields}
+
+        success, result = transform_schema(filtered_data)
+        if not success:
+            return transform_generic(data)
+        return result
+
+    return transform_record
+
+
+def get_skipped_fields(mdata):
+    """
+    Returns the top level fields the Transformer removes from a record as they
+    are not selected or unsupported.
+    """
+    skip_fields = set()
+    for breadcrumb, entry in (mdata or {}).items():
+        if not breadcrumb or entry.get('inclusion') == 'automatic':
+            continue
+        if entry.get('selected') is False or entry.get('inclusion') == 'unsupported':
+            # Nested field selection is left to the Transformer
+            if len(breadcrumb) != 2 or breadcrumb[0] != 'properties':
+                raise UnsupportedSchema(breadcrumb)
+            skip_fields.add(breadcrumb[1])
+    return frozenset(skip_fields)
+
+
+def get_datetime_parser(integer_datetime_fmt):
+    if integer_datetime_fmt == NO_INTEGER_DATETIME_PARSING:
+        return string_to_datetime
+
+    if integer_datetime_fmt == UNIX_SECONDS_INTEGER_DATETIME_PARSING:
+        integer_parser = unix_seconds_to_datetime
+    else:
+        integer_parser = unix_milliseconds_to_datetime
+
+    def parse_datetime(value):
+        try:
+            return integer_parser(value)
+        except DATETIME_PARSE_ERRORS:
+            return string_to_datetime(value)
+
+    return parse_datetime
+
+
+def compile_schema(schema, parse_datetime):
+    """
+    Returns a function taking a value and returning a (success, transformed value)
+    tuple, mirroring `Transformer.transform_recur` for the given schema.
+    """
+    if "anyOf" in schema:
+        return compile_any_of([compile_schema(s, parse_datetime) for s in schema["anyOf"]])
+
+    if "type" not in schema:
+        # No typing information so the value is not transformed
+        return transform_untyped
+
+    types = schema["type"]
+    types = list(types) if isinstance(types, list) else [types]
+
+    # null is always tried last
+    if "null" in types:
+        types.remove("null")
+        types.append("null")
+
+    return compile_any_of([compile_type(typ, schema, parse_datetime) for typ in types])
+
+
+def compile_any_of(transforms):
+    if len(transforms) == 1:
+        return transforms[0]
+
+    def transform_any_of(data):
+        for transform in transforms:
+            success, result = transform(data)
+            if success:
+                return True, result
+        return False, None
+
+    return transform_any_of
+
+
+# pylint: disable=too-many-return-statements
+def compile_type(typ, schema, parse_datetime):
+    if typ == "null":
+        return transform_null
+
+    # The format takes precedence over the type, as in Transformer._transform
+    if schema.get("format") == "date-time":
+        def transform_datetime(data):
+            if data is None or data == "":
+                return False, None
+            data = parse_datetime(data)
+            if data is None:
+                return False, None
+            return True, data
+
+        return transform_datetime
+
+    if schema.get("format") == "singer.decimal":
+        return transform_decimal
+
+    if typ == "object":
+        return compile_object(schema.get("properties", {}),
+                              schema.get("patternProperties"),
+                              parse_datetime)
+
+    if typ == "array":
+        if "items" not in schema:
+            raise UnsupportedSchema(schema)
+        return compile_array(compile_schema(schema["items"], parse_datetime))
+
+    return TYPE_TRANSFORMS.get(typ, transform_unknown)
+
+
+def compile_object(properties, pattern_properties, parse_datetime):
+    if properties == {} and not pattern_properties:
+        # An object without properties is passed through as is
+        return lambda data: (isinstance(data, dict), data)
+
+    property_transforms = {key: compile_schema(sub_schema, parse_datetime)
+                           for key, sub_schema in properties.items()}
+    pattern_transforms = [(re.compile(pattern), compile_schema(sub_schema, parse_datetime))
+                          for pattern, sub_schema in (pattern_properties or {}).items()]
+
+    def get_pattern_transform(key):
+        matching = [transform for pattern, transform in pattern_transforms if pattern.match(key)]
+        return compile_any_of(matching) if matching else None
+
+    def transform_object(data):
+        if not isinstance(data, dict):
+            return False, None
+
+        result = {}
+        for key, value in data.items():
+            transform = property_transforms.get(key)
+            if transform is None and pattern_transforms:
+                transform = get_pattern_transform(key)
+            if transform is None:
+                # Fields missing from the schema are dropped
+                continue
+
+            success, result[key] = transform(value)
+            if not success:
+                return False, None
+
+        return True, result
+
+    return transform_object
+
+
+def compile_array(item_transform):
+    def transform_array(data):
+        if not isinstance(data, list):
+            return False, None
+
+        result = []
+        for row in data:
+            success, value = item_transform(row)
+            if not success:
+                return False, None
+            result.append(value)
+
+        return True, result
+
+    return transform_array
+
+
+def transform_untyped(data):
+    return True, data
+
+
+def transform_unknown(_data):
+    return False, None
+
+
+def transform_null(data):
+    if data is None or data == "":
+        return True, None
+    return False, None
+
+
+def transform_decimal(data):
+    if isinstance(data, (str, float, int)):
+        try:
+            return True, str(decimal.Decimal(str(data)))
+        except (ArithmeticError, ValueError):
+            return False, None
+    if isinstance(data, decimal.Decimal):
+        return True, 'NaN' if data.is_snan() else str(data)
+    return False, None
+
+
+def transform_string(data):
+    if data is None:
+        return False, None
+    return True, str(data)
+
+
+def transform_integer(data):
+    if isinstance(data, str):
+        data = data.replace(",", "")
+    try:
+        return True, int(data)
+    except (TypeError, ValueError, OverflowError):
+        return False, None
+
+
+def transform_number(data):
+    if isinstance(data, str):
+        data = data.replace(",", "")
+    try:
+        return True, float(data)
+    except (TypeError, ValueError, OverflowError):
+        return False, None
+
+
+def transform_boolean(data):
+    if isinstance(data, str) and data.lower() == "false":
+        return True, False
+    return True, bool(data)
+
+
+TYPE_TRANSFORMS = {
+    "string": transform_string,
+    "integer": transform_integer,
+    "number": transform_number,
+    "boolean": transform_boolean,
+}
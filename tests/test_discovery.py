@@ -1,12 +1,14 @@
 """
 Test tap discovery
 """
-import re
+import string
 
 from tap_tester import menagerie
 
 from base import BaseTapTest
 
+STREAM_NAME_CHARACTERS = frozenset(string.ascii_lowercase + "_")
+
 
 class DiscoveryTest(BaseTapTest):
     """ Test the tap discovery """
@@ -56,13 +58,18 @@ class DiscoveryTest(BaseTapTest):
 
         # Verify stream names follow naming convention
         # streams should only have lowercase alphas and underscores
-        self.assertTrue(all([re.fullmatch(r"[a-z_]+", name) for name in found_catalog_names]),
+        self.assertTrue(all(name and set(name) <= STREAM_NAME_CHARACTERS
+                            for name in found_catalog_names),
                         msg="One or more streams don't follow standard naming")
 
+        catalogs_by_name = {catalog["stream_name"]: catalog for catalog in found_catalogs}
+        expected_replication_keys = self.expected_replication_keys()
+        expected_primary_keys = self.expected_primary_keys()
+        expected_replication_method = self.expected_replication_method()
+
         for stream in expected_streams:
             with self.subTest(stream=stream):
-                catalog = next(iter([catalog for catalog in found_catalogs
-                                     if catalog["stream_name"] == stream]))
+                catalog = catalogs_by_name.get(stream)
                 assert catalog  # based on previous tests this should always be found
 
                 schema_and_metadata = menagerie.get_annotated_schema(conn_id, catalog['stream_id'])
@@ -83,32 +90,29 @@ class DiscoveryTest(BaseTapTest):
                 # Verify there are no duplicate/conflicting metadata entries.
                 self.assertEqual(len(actual_fields), len(set(actual_fields)), msg="There are duplicate entries in the fields of '{}' stream".format(stream))
 
+                stream_metadata = stream_properties[0].get("metadata") or {}
+                actual_replication_keys = set(stream_metadata.get(self.REPLICATION_KEYS, []))
+                actual_primary_keys = set(stream_metadata.get(self.PRIMARY_KEYS, []))
+
                 # verify replication key(s)
                 self.assertEqual(
-                    set(stream_properties[0].get(
-                        "metadata", {self.REPLICATION_KEYS: []}).get(self.REPLICATION_KEYS, [])),
-                    self.expected_replication_keys()[stream],
+                    actual_replication_keys,
+                    expected_replication_keys[stream],
                     msg="expected replication key {} but actual is {}".format(
-                        self.expected_replication_keys()[stream],
-                        set(stream_properties[0].get(
-                            "metadata", {self.REPLICATION_KEYS: None}).get(
-                            self.REPLICATION_KEYS, []))))
+                        expected_replication_keys[stream],
+                        actual_replication_keys))
 
                 # verify primary key(s)
                 self.assertEqual(
-                    set(stream_properties[0].get(
-                        "metadata", {self.PRIMARY_KEYS: []}).get(self.PRIMARY_KEYS, [])),
-                    self.expected_primary_keys()[stream],
+                    actual_primary_keys,
+                    expected_primary_keys[stream],
                     msg="expected primary key {} but actual is {}".format(
-                        self.expected_primary_keys()[stream],
-                        set(stream_properties[0].get(
-                            "metadata", {self.PRIMARY_KEYS: None}).get(self.PRIMARY_KEYS, []))))
+                        expected_primary_keys[stream],
+                        actual_primary_keys))
 
                 # verify that if there is a replication key we are doing INCREMENTAL otherwise FULL
-                actual_replication_method = stream_properties[0].get(
-                    "metadata", {self.REPLICATION_METHOD: None}).get(self.REPLICATION_METHOD)
-                if stream_properties[0].get(
-                        "metadata", {self.REPLICATION_KEYS: []}).get(self.REPLICATION_KEYS, []):
+                actual_replication_method = stream_metadata.get(self.REPLICATION_METHOD)
+                if actual_replication_keys:
 
                     self.assertTrue(actual_replication_method == self.INCREMENTAL,
                                     msg="Expected INCREMENTAL replication "
@@ -120,15 +124,14 @@ class DiscoveryTest(BaseTapTest):
 
                 # verify the actual replication matches our expected replication method
                 self.assertEqual(
-                    self.expected_replication_method().get(stream, None),
+                    expected_replication_method.get(stream, None),
                     actual_replication_method,
                     msg="The actual replication method {} doesn't match the expected {}".format(
                         actual_replication_method,
-                        self.expected_replication_method().get(stream, None)))
+                        expected_replication_method.get(stream, None)))
 
-                expected_primary_keys = self.expected_primary_keys()[stream]
-                expected_replication_keys = self.expected_replication_keys()[stream]
-                expected_automatic_fields = expected_primary_keys | expected_replication_keys
+                expected_automatic_fields = \
+                    expected_primary_keys[stream] | expected_replication_keys[stream]
 
                 # verify that primary, replication and foreign keys
                 # are given the inclusion of automatic in annotated schema.
@@ -75,6 +75,56 @@ class TestStream(unittest.TestCase):
 
         self.assertEqual(result, mock_response["data"]["products"])
 
+    @patch('tap_shopify.streams.base.time.sleep')
+    @patch('shopify.GraphQL')
+    @patch.object(Stream, 'get_query', return_value='mocked_query')
+    def test_call_api_throttles_on_query_cost(self, mock_get_query, mock_graphql, mock_sleep):
+        """Test that the request sleeps when most of the query cost bucket is used."""
+        mock_response = {
+            "data": {"products": {}},
+            "extensions": {
+                "cost": {
+                    "throttleStatus": {
+                        "maximumAvailable": 2000.0,
+                        "currentlyAvailable": 200.0,
+                        "restoreRate": 100.0
+                    }
+                }
+            }
+        }
+        mock_graphql.return_value.execute.return_value = json.dumps(mock_response)
+
+        query_params = self.stream.get_query_params("2025-01-01T00:00:00Z", "2025-01-02T00:00:00Z")
+        self.stream.call_api(query_params)
+
+        # Sleep until 30% (600 points) of the bucket is available again
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 4.0)
+
+    @patch('tap_shopify.streams.base.time.sleep')
+    @patch('shopify.GraphQL')
+    @patch.object(Stream, 'get_query', return_value='mocked_query')
+    def test_call_api_no_throttle_below_threshold(self, mock_get_query, mock_graphql, mock_sleep):
+        """Test that the request does not sleep when the query cost bucket has capacity."""
+        mock_response = {
+            "data": {"products": {}},
+            "extensions": {
+                "cost": {
+                    "throttleStatus": {
+                        "maximumAvailable": 2000.0,
+                        "currentlyAvailable": 1500.0,
+                        "restoreRate": 100.0
+                    }
+                }
+            }
+        }
+        mock_graphql.return_value.execute.return_value = json.dumps(mock_response)
+
+        query_params = self.stream.get_query_params("2025-01-01T00:00:00Z", "2025-01-02T00:00:00Z")
+        self.stream.call_api(query_params)
+
+        mock_sleep.assert_not_called()
+
     @patch('shopify.GraphQL')
     @patch.object(Stream, 'get_query', return_value='mocked_query')
     def test_call_api_error(self, mock_get_query, mock_graphql):
@@ -0,0 +1,89 @@
+import io
+import json
+import unittest
+from unittest import mock
+import tap_shopify
+from tap_shopify.context import Context
+from tap_shopify.streams import base
+
+SHOP_ATTRIBUTES = {"id": 1, "name": "shop", "myshopify_domain": "shop.myshopify.com"}
+
+
+def get_fake_stream(name, record_count):
+    class FakeStream():
+        def sync(self):
+            for i in range(record_count):
+                yield {"id": i}
+            base.write_state({"bookmarks": {name: {"updatedAt": "2025-01-01T00:00:00Z"}}})
+    return FakeStream
+
+
+def get_catalog_entry(name):
+    return {
+        "tap_stream_id": name,
+        "stream": name,
+        "schema": {"type": "object", "properties": {
+            "id": {"type": ["null", "integer"]},
+            "_sdc_shop_id": {"type": ["null", "integer"]}}},
+        "metadata": [{"breadcrumb": [], "metadata": {"selected": True}}],
+        "key_properties": ["id"],
+        "replication_key": None
+    }
+
+
+@mock.patch("sys.stdout", new_callable=io.StringIO)
+@mock.patch("tap_shopify.initialize_shopify_client", return_value=SHOP_ATTRIBUTES)
+class TestParallelSync(unittest.TestCase):
+
+    def setUp(self):
+        self.original = (Context.config, Context.state, Context.catalog,
+                         Context.stream_objects, Context.stream_map)
+        Context.state = {"bookmarks": {"currently_sync_stream": "customers"}}
+        Context.catalog = {"streams": [get_catalog_entry("products"),
+                                       get_catalog_entry("customers")]}
+        Context.stream_objects = {"products": get_fake_stream("products", 5),
+                                  "customers": get_fake_stream("customers", 3)}
+        Context.stream_map = {}
+        Context.counts = {}
+        Context.last_written_state = None
+
+    def tearDown(self):
+        (Context.config, Context.state, Context.catalog,
+         Context.stream_objects, Context.stream_map) = self.original
+
+    def get_messages(self, stdout):
+        return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def assert_all_records_written(self, messages):
+        records = [m for m in messages if m["type"] == "RECORD"]
+        self.assertEqual(len([m for m in records if m["stream"] == "products"]), 5)
+        self.assertEqual(len([m for m in records if m["stream"] == "customers"]), 3)
+        self.assertEqual(Context.counts, {"products": 5, "customers": 3})
+
+    def test_sync_in_parallel(self, mocked_client, mocked_stdout):
+        Context.config = {"max_workers": 2}
+        with mock.patch("tap_shopify.shopify.ShopifyResource") as mocked_resource:
+            mocked_resource.get_headers.return_value = {"X-Shopify-Access-Token": "token"}
+            tap_shopify.sync()
+        mocked_resource.set_headers.assert_called_with({"X-Shopify-Access-Token": "token"})
+
+        messages = self.get_messages(mocked_stdout)
+        self.assert_all_records_written(messages)
+        # currently_sync_stream is not tracked when streams are synced in parallel
+        states = [m["value"] for m in messages if m["type"] == "STATE"]
+        self.assertTrue(all("currently_sync_stream" not in s.get("bookmarks", {})
+                            for s in states))
+
+    def test_sync_sequentially_by_default(self, mocked_client, mocked_stdout):
+        Context.config = {}
+        tap_shopify.sync()
+
+        messages = self.get_messages(mocked_stdout)
+        self.assert_all_records_written(messages)
+        # The currently syncing stream from the state is synced first
+        records = [m for m in messages if m["type"] == "RECORD"]
+        self.assertEqual(records[0]["stream"], "customers")
+
+    def test_invalid_max_workers(self, mocked_client, mocked_stdout):
+        Context.config = {"max_workers": "many"}
+        self.assertEqual(tap_shopify.get_max_workers(), 1)
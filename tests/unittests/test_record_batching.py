@@ -0,0 +1,50 @@
+import io
+import json
+import unittest
+from unittest import mock
+from tap_shopify.streams import base
+from tap_shopify.context import Context
+
+
+@mock.patch("sys.stdout", new_callable=io.StringIO)
+class TestRecordBatching(unittest.TestCase):
+
+    def setUp(self):
+        base.RECORD_MESSAGES.clear()
+        Context.last_written_state = None
+
+    def get_messages(self, stdout):
+        return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_records_buffered_until_batch_size(self, mocked_stdout):
+        with mock.patch.object(base, "RECORD_BATCH_SIZE", 3):
+            base.write_record("products", {"id": 1})
+            base.write_record("products", {"id": 2})
+            self.assertEqual(mocked_stdout.getvalue(), "")
+
+            base.write_record("products", {"id": 3})
+
+        messages = self.get_messages(mocked_stdout)
+        self.assertEqual([m["record"]["id"] for m in messages], [1, 2, 3])
+        self.assertEqual(base.RECORD_MESSAGES, [])
+
+    def test_state_written_after_buffered_records(self, mocked_stdout):
+        base.write_record("products", {"id": 1})
+        base.write_state({"bookmarks": {"products": {"updatedAt": "2025-01-01T00:00:00Z"}}})
+
+        messages = self.get_messages(mocked_stdout)
+        self.assertEqual([m["type"] for m in messages], ["RECORD", "STATE"])
+
+    def test_unchanged_state_not_written_again(self, mocked_stdout):
+        state = {"bookmarks": {"products": {"updatedAt": "2025-01-01T00:00:00Z"}}}
+        base.write_state(state)
+        base.write_state(state)
+        self.assertEqual(len(self.get_messages(mocked_stdout)), 1)
+
+        state["bookmarks"]["products"]["updatedAt"] = "2025-01-02T00:00:00Z"
+        base.write_state(state)
+        self.assertEqual(len(self.get_messages(mocked_stdout)), 2)
+
+    def test_flush_records_without_records(self, mocked_stdout):
+        base.flush_records()
+        self.assertEqual(mocked_stdout.getvalue(), "")
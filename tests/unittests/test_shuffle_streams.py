@@ -0,0 +1,34 @@
+import unittest
+import tap_shopify
+from tap_shopify.context import Context
+
+class TestShuffleStreams(unittest.TestCase):
+
+    def setUp(self):
+        self.original_catalog = Context.catalog
+        Context.catalog = {
+            "streams": [
+                {"tap_stream_id": "orders"},
+                {"tap_stream_id": "products"},
+                {"tap_stream_id": "customers"},
+                {"tap_stream_id": "events"}
+            ]
+        }
+
+    def tearDown(self):
+        Context.catalog = self.original_catalog
+
+    def get_stream_ids(self):
+        return [s["tap_stream_id"] for s in Context.catalog["streams"]]
+
+    def test_currently_syncing_stream_moved_to_top(self):
+        tap_shopify.shuffle_streams("customers")
+        self.assertEqual(self.get_stream_ids(), ["customers", "events", "orders", "products"])
+
+    def test_first_stream_keeps_order(self):
+        tap_shopify.shuffle_streams("orders")
+        self.assertEqual(self.get_stream_ids(), ["orders", "products", "customers", "events"])
+
+    def test_unknown_stream_keeps_order(self):
+        tap_shopify.shuffle_streams("collections")
+        self.assertEqual(self.get_stream_ids(), ["orders", "products", "customers", "events"])
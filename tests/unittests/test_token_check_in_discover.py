@@ -1,3 +1,4 @@
+import io
 from unittest import mock
 
 import pyactiveresource
@@ -23,12 +24,12 @@ def connection_error_raiser():
 
 @mock.patch('tap_shopify.utils.parse_args')
 @mock.patch('tap_shopify.discover', side_effect=tap_shopify.discover)
-@mock.patch("builtins.print")
+@mock.patch("sys.stdout", new_callable=io.StringIO)
 @mock.patch("tap_shopify.has_read_users_access")
 class TestTokenInDiscoverMode(unittest.TestCase):
 
     @mock.patch('tap_shopify.initialize_shopify_client', side_effect=resource_not_found_raiser)
-    def test_resource_not_found(self, mocked_client, mocked_access, mocked_print, mocked_discover, mocked_args):
+    def test_resource_not_found(self, mocked_client, mocked_access, mocked_stdout, mocked_discover, mocked_args):
         '''
             Verify exception is raised for ResourceNotFound with proper error message and
             test that discover mode is called 
@@ -41,10 +42,10 @@ class TestTokenInDiscoverMode(unittest.TestCase):
             self.assertEqual(str(e), 'ResourceNotFound\nEnsure shop is entered correctly')
             self.assertEqual(mocked_discover.call_count, 1)
             self.assertEqual(mocked_client.call_count, 1)
-            self.assertEqual(mocked_print.call_count, 0)
+            self.assertEqual(mocked_stdout.getvalue(), '')
 
     @mock.patch('tap_shopify.initialize_shopify_client', side_effect=unauthorized_access_raiser)
-    def test_unauthorized_access(self, mocked_client, mocked_access, mocked_print, mocked_discover, mocked_args):
+    def test_unauthorized_access(self, mocked_client, mocked_access, mocked_stdout, mocked_discover, mocked_args):
         '''
             Verify exception is raised for UnauthorizedAccess with proper error message and
             test that discover mode is called 
@@ -57,10 +58,10 @@ class TestTokenInDiscoverMode(unittest.TestCase):
             self.assertEqual(str(e), 'UnauthorizedAccess\nInvalid access token - Re-authorize the connection')
             self.assertEqual(mocked_discover.call_count, 1)
             self.assertEqual(mocked_client.call_count, 1)
-            self.assertEqual(mocked_print.call_count, 0)
+            self.assertEqual(mocked_stdout.getvalue(), '')
 
     @mock.patch('tap_shopify.initialize_shopify_client', side_effect=connection_error_raiser)
-    def test_connection_error(self, mocked_client, mocked_access, mocked_print, mocked_discover, mocked_args):
+    def test_connection_error(self, mocked_client, mocked_access, mocked_stdout, mocked_discover, mocked_args):
         '''
             Verify exception is raised for ConnectionError with proper error message and
             test that discover mode is called 
@@ -73,17 +74,16 @@ class TestTokenInDiscoverMode(unittest.TestCase):
             self.assertEqual(str(e), 'ConnectionError\n')
             self.assertEqual(mocked_discover.call_count, 1)
             self.assertEqual(mocked_client.call_count, 1)
-            self.assertEqual(mocked_print.call_count, 0)
+            self.assertEqual(mocked_stdout.getvalue(), '')
 
     @mock.patch('tap_shopify.initialize_shopify_client')
-    def test_no_error(self, mocked_client, mocked_access, mocked_print, mocked_discover, mocked_args):
+    def test_no_error(self, mocked_client, mocked_access, mocked_stdout, mocked_discover, mocked_args):
         '''
-            Verify that if no error during discover then print should be called once for
-            writing catalog
+            Verify that if no error during discover then the catalog is written to stdout
         '''
         mocked_access.return_value = True
         mocked_args.return_value = Args()
         tap_shopify.main()
         self.assertEqual(mocked_discover.call_count, 1)
         self.assertEqual(mocked_client.call_count, 1)
-        self.assertEqual(mocked_print.call_count, 1)
+        self.assertIn('"streams"', mocked_stdout.getvalue())
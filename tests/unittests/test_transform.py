@@ -0,0 +1,91 @@
+import unittest
+import singer
+from singer import Transformer
+from singer.transform import SchemaMismatch
+from tap_shopify.transform import compile_transform
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": ["null", "integer"]},
+        "name": {"type": ["null", "string"]},
+        "price": {"type": ["null", "number"], "format": "singer.decimal"},
+        "weight": {"type": ["null", "number"]},
+        "taxable": {"type": ["null", "boolean"]},
+        "updatedAt": {"type": ["null", "string"], "format": "date-time"},
+        "tags": {"type": ["null", "array"], "items": {"type": ["null", "string"]}},
+        "address": {
+            "type": ["null", "object"],
+            "properties": {
+                "city": {"type": ["null", "string"]},
+                "zip": {"anyOf": [{"type": "integer"}, {"type": "string"}]}
+            }
+        },
+        "attributes": {"type": ["null", "object"], "properties": {}},
+        "author": {"type": ["null", "string"]}
+    }
+}
+
+METADATA = {
+    (): {"selected": True},
+    ("properties", "id"): {"inclusion": "automatic"},
+    ("properties", "author"): {"inclusion": "unsupported"},
+    ("properties", "weight"): {"inclusion": "available", "selected": False}
+}
+
+
+class TestCompileTransform(unittest.TestCase):
+
+    def transform_both(self, record, metadata=METADATA):
+        transformer = Transformer(singer.UNIX_SECONDS_INTEGER_DATETIME_PARSING)
+        expected = transformer.transform(dict(record), SCHEMA, metadata)
+        transform_record = compile_transform(
+            Transformer(singer.UNIX_SECONDS_INTEGER_DATETIME_PARSING), SCHEMA, metadata)
+        return expected, transform_record(dict(record))
+
+    def test_matches_transformer(self):
+        record = {
+            "id": "1,234",
+            "name": 12,
+            "price": 10.5,
+            "weight": 2.0,
+            "taxable": "false",
+            "updatedAt": 1735689600,
+            "tags": ["a", 1, None],
+            "address": {"city": "Ottawa", "zip": "K1A", "unknown": 1},
+            "attributes": {"any": "value"},
+            "author": "someone",
+            "not_in_schema": True
+        }
+        expected, actual = self.transform_both(record)
+        self.assertEqual(expected, actual)
+        self.assertEqual(actual["id"], 1234)
+        self.assertEqual(actual["updatedAt"], "2025-01-01T00:00:00.000000Z")
+        self.assertNotIn("weight", actual)
+        self.assertNotIn("author", actual)
+        self.assertNotIn("not_in_schema", actual)
+
+    def test_matches_transformer_for_null_values(self):
+        record = {"id": None, "name": "", "updatedAt": "", "tags": None, "address": None}
+        expected, actual = self.transform_both(record)
+        self.assertEqual(expected, actual)
+
+    def test_matches_transformer_without_metadata(self):
+        record = {"id": 1, "weight": "1,000.5", "author": "someone"}
+        expected, actual = self.transform_both(record, metadata=None)
+        self.assertEqual(expected, actual)
+        self.assertEqual(actual["weight"], 1000.5)
+
+    def test_schema_mismatch_raised(self):
+        transform_record = compile_transform(
+            Transformer(singer.UNIX_SECONDS_INTEGER_DATETIME_PARSING), SCHEMA, METADATA)
+        with self.assertRaises(SchemaMismatch) as error:
+            transform_record({"id": "not an int", "tags": "not a list"})
+        self.assertIn("id", str(error.exception))
+        self.assertIn("tags", str(error.exception))
+
+    def test_nested_metadata_uses_transformer(self):
+        metadata = {("properties", "address", "properties", "city"): {"selected": False}}
+        record = {"address": {"city": "Ottawa", "zip": 1}}
+        expected, actual = self.transform_both(record, metadata=metadata)
+        self.assertEqual(expected, actual)